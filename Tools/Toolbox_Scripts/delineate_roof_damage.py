@@ -1,292 +1,458 @@
-"""
-This is the script for the Delineate Roof Damage tool, which is part of the Roof Damage Assessment
-toolbox for Esri ArcGIS Pro. The script can be run using the Delineate Roof Damage tool or it can be
-imported as a module and run by calling the main() function.
-
-For full methodological details, please refer to the publication:
-
-Kucharczyk, M., Nesbit, P. R., & Hugenholtz, C. H. (2025). Automated Mapping of Post-Storm
-Roof Damage Using Deep Learning and Aerial Imagery: A Case Study in the Caribbean. Remote Sensing,
-17(20), 3456. https://doi.org/10.3390/rs17203456
-
-For usage instructions, please visit: https://github.com/maja-kucharczyk/roof-damage-assessment
-
-Created by: Maja Kucharczyk
-
-Version: 1.0.0 (2026-01-25)
-
-This work is licensed under CC BY 4.0 (Creative Commons Attribution 4.0 International), a permissive
-license allowing anyone to freely share, copy, adapt, and use material for any purpose, even
-commercially, as long as they give proper attribution (credit) to the original creators, indicate
-if changes were made, and provide a link to the license.
-"""
-
-
-# Imports
-import os
-import arcpy
-import arcpy.ia
-
-
-def get_workspace_extension(
-        workspace_path: str,
-        ) -> str:
-    """
-    Returns the extension of a workspace path.
-    
-    Args:
-        workspace_path (string): The path to the workspace.
-        
-    Returns:
-        string: The extension of the workspace.
-    """
-    name_with_extension = os.path.basename(workspace_path)
-    extension = os.path.splitext(name_with_extension)[1]
-    return extension
-
-
-def generate_classified_raster(
-        input_image_path: str,
-        input_model_path: str,
-        ):
-    """
-    Generates a classified raster using an input image and trained deep learning model.
-    
-    Args:
-        input_image_path (string): The path to the input image.
-        input_model_path (string): The path to the trained deep learning model (.emd or .dlpk).
-        
-    Returns:
-        classified_raster: A raster with cell values corresponding to the class(es) of the model.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            processorType = 'GPU',
-            gpuId = 0,
-            ):
-        classified_raster = arcpy.ia.ClassifyPixelsUsingDeepLearning(
-            in_raster = input_image_path,
-            in_model_definition = input_model_path,
-            arguments =
-            'batch_size 4; padding 128; predict_background False; test_time_augmentation False',
-            )
-    return classified_raster
-
-
-def raster_to_fclass(
-        input_raster_path: str,
-        output_fclass_path: str,
-        ):
-    """
-    Converts a classified raster to a feature class.
-    Contiguous cells of the same class are grouped to form single-part polygons.
-    
-    Args:
-        input_raster_path (string): The path to the input raster.
-        output_fclass_path (string): The path to the output feature class.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            ):
-        arcpy.conversion.RasterToPolygon(
-            in_raster = input_raster_path,
-            out_polygon_features = output_fclass_path,
-            simplify = 'NO_SIMPLIFY',
-            raster_field = 'Class',
-            create_multipart_features = 'SINGLE_OUTER_PART')
-
-
-def delete_fclass_fields(
-        input_fclass_path: str,
-        ):
-    """
-    Deletes the "Id" and "gridcode" fields from a feature class.
-    
-    Args:
-        input_fclass_path (string): The path to the input feature class.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            ):
-        arcpy.management.DeleteField(
-            in_table = input_fclass_path,
-            drop_field = ['Id', 'gridcode'],
-            method = 'DELETE_FIELDS')
-
-
-def merge_fclasses(
-        fclass_paths_list: list,
-        output_fclass_path: str,
-        ):
-    """
-    Merges feature classes into one feature class.
-    
-    Args:
-        fclass_paths_list (list): A list of (string) paths to feature classes.
-        output_fclass_path (string): The path to the output feature class.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            ):
-        arcpy.management.Merge(
-            inputs = fclass_paths_list,
-            output = output_fclass_path,
-            add_source = 'NO_SOURCE_INFO',
-            field_match_mode = 'AUTOMATIC',
-            )
-
-
-def main(
-        input_images_gdb: str = arcpy.GetParameterAsText(0),
-        model_path_decking: str = arcpy.GetParameterAsText(1),
-        model_path_hole: str = arcpy.GetParameterAsText(2),
-        model_path_dual: str = arcpy.GetParameterAsText(3),
-        output_fclasses_gdb: str = arcpy.GetParameterAsText(4),
-        scratch_gdb: str = arcpy.GetParameterAsText(5),
-        ):
-    """
-    Delineates roof decking and roof holes in aerial imagery using trained deep learning models.
-    
-    Args:
-        input_images_gdb (string): The path to the prepared test images file geodatabase.
-        model_path_decking (string, optional): The path to the trained single-class roof decking model (.emd or .dlpk).
-        model_path_hole (string, optional): The path to the trained single-class roof hole model (.emd or .dlpk).
-        model_path_dual (string, optional): The path to the trained dual-class (decking and hole) model (.emd or .dlpk).
-        output_fclasses_gdb (string): The path to the output file geodatabase for predicted polygons.
-        scratch_gdb (string): The path to the scratch file geodatabase for intermediate outputs.
-        
-    Raises:
-        FileNotFoundError: If a workspace/model does not exist or if there are zero input images.
-        ValueError: If input_images_gdb, output_fclasses_gdb, or scratch_gdb does not correspond 
-                    to a file geodatabase.
-    """
-
-    # If a workspace does not exist, end the process
-    for path in [input_images_gdb, output_fclasses_gdb, scratch_gdb]:
-        if os.path.exists(path):
-            continue
-        arcpy.AddError(f'{path} does not exist.')
-        raise FileNotFoundError(f'{path} does not exist.')
-
-    # If there are zero input model paths, end the process
-    model_paths = []
-    for path in [model_path_decking, model_path_hole, model_path_dual]:
-        if path == '':
-            continue
-        model_paths.append(path)
-    if len(model_paths) == 0:
-        arcpy.AddError('There are zero input models. Input at least one model path '
-                       '(.emd or .dlpk).')
-        raise FileNotFoundError('There are zero input models. Input at least one model path '
-                       '(.emd or .dlpk).')
-
-    # If a model path does not exist, end the process
-    for path in model_paths:
-        if os.path.exists(path):
-            continue
-        arcpy.AddError(f'{path} does not exist.')
-        raise FileNotFoundError(f'{path} does not exist.')
-
-    # If the input images path is not a file geodatabase, end the process
-    if get_workspace_extension(workspace_path = input_images_gdb) != '.gdb':
-        arcpy.AddError('The input images path must correspond to a file geodatabase (.gdb).')
-        raise ValueError('The input images path must correspond to a file geodatabase (.gdb).')
-
-    # If the output feature classes path is not a file geodatabase, end the process
-    if get_workspace_extension(workspace_path = output_fclasses_gdb) != '.gdb':
-        arcpy.AddError('The output path must correspond to a file geodatabase (.gdb).')
-        raise ValueError('The output path must correspond to a file geodatabase (.gdb).')
-
-    # If the scratch path is not a file geodatabase, end the process
-    if get_workspace_extension(workspace_path = scratch_gdb) != '.gdb':
-        arcpy.AddError('The scratch path must correspond to a file geodatabase (.gdb).')
-        raise ValueError('The scratch path must correspond to a file geodatabase (.gdb).')
-
-    # Set the scratch workspace to the scratch file geodatabase path
-    arcpy.env.scratchWorkspace = scratch_gdb
-
-    # Create a list of input images
-    arcpy.env.workspace = input_images_gdb
-    images = arcpy.ListRasters()
-
-    # Count the total number of images
-    images_remaining = len(images)
-
-    # If there are zero images, end the process
-    if images_remaining == 0:
-        arcpy.AddError('The input images file geodatabase contains zero rasters.')
-        raise FileNotFoundError('The input images file geodatabase contains zero rasters.')
-
-    # create dictionary of input models
-    model_dictionary = {}
-
-    if model_path_decking != '':
-        model_dictionary['decking'] = model_path_decking
-
-    if model_path_hole != '':
-        model_dictionary['hole'] = model_path_hole
-
-    if model_path_dual != '':
-        model_dictionary['dual'] = model_path_dual
-
-    # Configure the tool's progress bar to increment by 100% divided by the total number of images
-    arcpy.SetProgressor(
-        type = 'step',
-        message = '',
-        min_range = 0,
-        max_range = 100,
-        step_value = int(100/images_remaining),
-        )
-
-    # For each image:
-    for image in images:
-
-        arcpy.SetProgressorLabel(f'Delineating roof damage in {image}')
-        print(f'Delineating roof damage in {image}')
-
-        # Create a list to store the path to the roof damage feature class predicted by each model
-        predicted_fclass_paths = []
-
-        # For each model:
-        for damage_class, model_path in model_dictionary.items():
-
-            # Generate a roof damage raster
-            roof_damage_raster = generate_classified_raster(
-                input_image_path = os.path.join(input_images_gdb, image),
-                input_model_path = model_path,
-                )
-
-            # Convert the roof damage raster to a single-part polygon feature class
-            raster_to_fclass(
-                input_raster_path = roof_damage_raster,
-                output_fclass_path = os.path.join(scratch_gdb, f'{image}_{damage_class}'),
-                )
-
-            # Delete the "Id" and "gridcode" fields from the polygon feature class
-            delete_fclass_fields(
-                input_fclass_path = os.path.join(scratch_gdb, f'{image}_{damage_class}'),
-                )
-
-            # Append the feature class to the predicted feature class paths list
-            predicted_fclass_paths.append(os.path.join(scratch_gdb, f'{image}_{damage_class}'))
-
-        # Merge the model-specific feature classes into one feature class per image
-        merge_fclasses(
-            fclass_paths_list = predicted_fclass_paths,
-            output_fclass_path = os.path.join(output_fclasses_gdb, image),
-            )
-
-        # Update the progress indicators
-        arcpy.SetProgressorPosition()
-        images_remaining -= 1
-        arcpy.AddMessage(f'Delineated roof damage in {image}. {images_remaining} images remaining.')
-        print(f'Delineated roof damage in {image}. {images_remaining} images remaining.')
-
-    # Confirm processing is done
-    arcpy.AddMessage(f'\nExported predicted polygons feature classes to {output_fclasses_gdb}')
-    print(f'\nExported predicted polygons feature classes to {output_fclasses_gdb}')
-
-
-# Delineate roof damage in each image
-if __name__ == '__main__':
-    main()
+"""
+This is the script for the Delineate Roof Damage tool, which is part of the Roof Damage Assessment
+toolbox for Esri ArcGIS Pro. The script can be run using the Delineate Roof Damage tool or it can be
+imported as a module and run by calling the main() function.
+
+For full methodological details, please refer to the publication:
+
+Kucharczyk, M., Nesbit, P. R., & Hugenholtz, C. H. (2025). Automated Mapping of Post-Storm
+Roof Damage Using Deep Learning and Aerial Imagery: A Case Study in the Caribbean. Remote Sensing,
+17(20), 3456. https://doi.org/10.3390/rs17203456
+
+For usage instructions, please visit: https://github.com/maja-kucharczyk/roof-damage-assessment
+
+Created by: Maja Kucharczyk
+
+Version: 1.0.0 (2026-01-25)
+
+This work is licensed under CC BY 4.0 (Creative Commons Attribution 4.0 International), a permissive
+license allowing anyone to freely share, copy, adapt, and use material for any purpose, even
+commercially, as long as they give proper attribution (credit) to the original creators, indicate
+if changes were made, and provide a link to the license.
+"""
+
+
+# Imports
+import os
+import arcpy
+import arcpy.ia
+import numpy
+
+# GDAL ships with ArcGIS Pro's Python environment and its Polygonize carries the recent
+# upstream performance improvements, but the import is still guarded so the tool falls back
+# to RasterToPolygon in environments where osgeo is unavailable
+try:
+    from osgeo import gdal, ogr
+    USE_FAST_POLYGONIZE = True
+except ImportError:
+    USE_FAST_POLYGONIZE = False
+
+
+def get_workspace_extension(
+        workspace_path: str,
+        ) -> str:
+    """
+    Returns the extension of a workspace path.
+    
+    Args:
+        workspace_path (string): The path to the workspace.
+        
+    Returns:
+        string: The extension of the workspace.
+    """
+    name_with_extension = os.path.basename(workspace_path)
+    extension = os.path.splitext(name_with_extension)[1]
+    return extension
+
+
+def generate_classified_raster(
+        input_image_path: str,
+        input_model_path: str,
+        batch_size: int = 16,
+        ):
+    """
+    Generates a classified raster using an input image and trained deep learning model.
+
+    Args:
+        input_image_path (string): The path to the input image.
+        input_model_path (string): The path to the trained deep learning model (.emd or .dlpk).
+        batch_size (integer): The number of image tiles processed per inference pass. If the
+                              GPU runs out of memory, the batch size is halved until the
+                              inference pass succeeds.
+
+    Returns:
+        classified_raster: A raster with cell values corresponding to the class(es) of the model.
+    """
+    # Try the requested batch size first and halve it on failure so tile
+    # inference uses as much of the GPU as the model and image allow
+    while True:
+        try:
+            classified_raster = arcpy.ia.ClassifyPixelsUsingDeepLearning(
+                in_raster = input_image_path,
+                in_model_definition = input_model_path,
+                arguments =
+                f'batch_size {batch_size}; padding 64; predict_background False; '
+                f'test_time_augmentation False',
+                )
+            break
+        except arcpy.ExecuteError:
+            if batch_size == 1:
+                raise
+            batch_size = batch_size // 2
+            message = (f'Inference failed, possibly due to insufficient GPU memory. '
+                       f'Retrying with a batch size of {batch_size}.')
+            arcpy.AddWarning(message)
+            print(message)
+    return classified_raster
+
+
+def raster_to_fclass_fast(
+        input_raster_path: str,
+        output_fclass_path: str,
+        ):
+    """
+    Converts a classified raster to a feature class by polygonizing the raster's NumPy array
+    with GDAL, which avoids the geoprocessing overhead of RasterToPolygon and picks up the
+    recent GDAL Polygonize performance improvements. The whole conversion runs in memory.
+    Contiguous cells of the same class are grouped to form single-part polygons.
+    
+    Args:
+        input_raster_path (string): The path to the input raster.
+        output_fclass_path (string): The path to the output feature class.
+    """
+    raster = arcpy.Raster(input_raster_path)
+
+    # Narrow the array to one byte per cell, since damage class values fit in uint8 and the
+    # polygonization pass is bound by memory traffic
+    raster_array = arcpy.RasterToNumPyArray(raster, nodata_to_value = 0)
+    raster_array = raster_array.astype(numpy.uint8, copy = False)
+
+    # Copy the raster array into an in-memory GDAL raster
+    rows, columns = raster_array.shape
+    gdal_raster = gdal.GetDriverByName('MEM').Create('', columns, rows, 1, gdal.GDT_Byte)
+    gdal_raster.SetGeoTransform((raster.extent.XMin, raster.meanCellWidth, 0,
+                                 raster.extent.YMax, 0, -raster.meanCellHeight))
+    gdal_band = gdal_raster.GetRasterBand(1)
+    gdal_band.WriteArray(raster_array)
+
+    # Polygonize the raster into an in-memory OGR layer, using the band itself as the mask
+    # so zero-valued (undamaged) cells are excluded
+    ogr_datasource = ogr.GetDriverByName('Memory').CreateDataSource('')
+    ogr_layer = ogr_datasource.CreateLayer('polygons', geom_type = ogr.wkbPolygon)
+    ogr_layer.CreateField(ogr.FieldDefn('Value', ogr.OFTInteger))
+    gdal.Polygonize(gdal_band, gdal_band, ogr_layer, 0)
+
+    # Map each raster value to its class name using the raster attribute table
+    class_names = {row[0]: row[1]
+                   for row in arcpy.da.SearchCursor(raster.catalogPath, ['Value', 'Class'])}
+
+    # Create the output feature class with a "Class" field
+    arcpy.management.CreateFeatureclass(
+        out_path = os.path.dirname(output_fclass_path),
+        out_name = os.path.basename(output_fclass_path),
+        geometry_type = 'POLYGON',
+        spatial_reference = raster.spatialReference,
+        )
+    arcpy.management.AddField(
+        in_table = output_fclass_path,
+        field_name = 'Class',
+        field_type = 'TEXT',
+        )
+
+    # Insert one polygon per contiguous same-class region
+    with arcpy.da.InsertCursor(output_fclass_path, ['SHAPE@', 'Class']) as cursor:
+        for feature in ogr_layer:
+            geometry = arcpy.FromWKB(feature.GetGeometryRef().ExportToWkb())
+            cursor.insertRow([geometry, class_names[feature.GetField(0)]])
+
+
+def raster_to_fclass(
+        input_raster_path: str,
+        output_fclass_path: str,
+        ):
+    """
+    Converts a classified raster to a feature class.
+    Contiguous cells of the same class are grouped to form single-part polygons.
+    
+    Args:
+        input_raster_path (string): The path to the input raster.
+        output_fclass_path (string): The path to the output feature class.
+    """
+    if USE_FAST_POLYGONIZE:
+        raster_to_fclass_fast(
+            input_raster_path = input_raster_path,
+            output_fclass_path = output_fclass_path,
+            )
+        return
+    arcpy.conversion.RasterToPolygon(
+        in_raster = input_raster_path,
+        out_polygon_features = output_fclass_path,
+        simplify = 'NO_SIMPLIFY',
+        raster_field = 'Class',
+        create_multipart_features = 'SINGLE_OUTER_PART')
+
+
+def create_class_fclass(
+        output_fclass_path: str,
+        spatial_reference: arcpy.SpatialReference,
+        ):
+    """
+    Creates an empty polygon feature class with a "Class" text field.
+    
+    Args:
+        output_fclass_path (string): The path to the output feature class.
+        spatial_reference (SpatialReference): The spatial reference of the output feature class.
+    """
+    arcpy.management.CreateFeatureclass(
+        out_path = os.path.dirname(output_fclass_path),
+        out_name = os.path.basename(output_fclass_path),
+        geometry_type = 'POLYGON',
+        spatial_reference = spatial_reference,
+        )
+    arcpy.management.AddField(
+        in_table = output_fclass_path,
+        field_name = 'Class',
+        field_type = 'TEXT',
+        )
+
+
+def stream_fclasses(
+        fclass_paths_list: list,
+        output_fclass_path: str,
+        ):
+    """
+    Streams the features of one or more feature classes into an existing output feature class
+    with a single insert cursor. Only the shape and the "Class" field are read, so fields such
+    as "Id" and "gridcode" created by RasterToPolygon are dropped in passing, and no Merge
+    tool dispatch or intermediate table is needed.
+    
+    Args:
+        fclass_paths_list (list): A list of (string) paths to feature classes.
+        output_fclass_path (string): The path to the output feature class.
+    """
+    with arcpy.da.InsertCursor(output_fclass_path, ['SHAPE@', 'Class']) as insert_cursor:
+        for fclass_path in fclass_paths_list:
+            with arcpy.da.SearchCursor(fclass_path, ['SHAPE@', 'Class']) as search_cursor:
+                for row in search_cursor:
+                    insert_cursor.insertRow(row)
+
+
+def main(
+        input_images_gdb: str = arcpy.GetParameterAsText(0),
+        model_path_decking: str = arcpy.GetParameterAsText(1),
+        model_path_hole: str = arcpy.GetParameterAsText(2),
+        model_path_dual: str = arcpy.GetParameterAsText(3),
+        output_fclasses_gdb: str = arcpy.GetParameterAsText(4),
+        scratch_gdb: str = arcpy.GetParameterAsText(5),
+        force_separate_models: str = arcpy.GetParameterAsText(6),
+        ):
+    """
+    Delineates roof decking and roof holes in aerial imagery using trained deep learning models.
+    
+    Args:
+        input_images_gdb (string): The path to the prepared test images file geodatabase.
+        model_path_decking (string, optional): The path to the trained single-class roof decking model (.emd or .dlpk).
+        model_path_hole (string, optional): The path to the trained single-class roof hole model (.emd or .dlpk).
+        model_path_dual (string, optional): The path to the trained dual-class (decking and hole) model (.emd or .dlpk).
+        output_fclasses_gdb (string): The path to the output file geodatabase for predicted polygons.
+        scratch_gdb (string): The path to the scratch file geodatabase for intermediate outputs.
+        force_separate_models (string, optional): If 'true', the single-class models are run even
+                                                  when the dual-class model is supplied. By default
+                                                  the dual-class model replaces them, since it
+                                                  delineates both damage classes in one inference
+                                                  pass per image.
+        
+    Raises:
+        FileNotFoundError: If a workspace/model does not exist or if there are zero input images.
+        ValueError: If input_images_gdb, output_fclasses_gdb, or scratch_gdb does not correspond 
+                    to a file geodatabase.
+    """
+
+    # If there are zero input model paths, end the process
+    model_paths = []
+    for path in [model_path_decking, model_path_hole, model_path_dual]:
+        if path == '':
+            continue
+        model_paths.append(path)
+    if len(model_paths) == 0:
+        arcpy.AddError('There are zero input models. Input at least one model path '
+                       '(.emd or .dlpk).')
+        raise FileNotFoundError('There are zero input models. Input at least one model path '
+                       '(.emd or .dlpk).')
+
+    # If a workspace or model path does not exist, end the process, reporting every missing
+    # path at once instead of stopping at the first one
+    missing_paths = [path
+                     for path in [input_images_gdb, output_fclasses_gdb, scratch_gdb]
+                     + model_paths
+                     if not os.path.exists(path)]
+    if len(missing_paths) > 0:
+        arcpy.AddError(f'The following paths do not exist: {", ".join(missing_paths)}')
+        raise FileNotFoundError(f'The following paths do not exist: '
+                                f'{", ".join(missing_paths)}')
+
+    # If the input images path is not a file geodatabase, end the process
+    if get_workspace_extension(workspace_path = input_images_gdb) != '.gdb':
+        arcpy.AddError('The input images path must correspond to a file geodatabase (.gdb).')
+        raise ValueError('The input images path must correspond to a file geodatabase (.gdb).')
+
+    # If the output feature classes path is not a file geodatabase, end the process
+    if get_workspace_extension(workspace_path = output_fclasses_gdb) != '.gdb':
+        arcpy.AddError('The output path must correspond to a file geodatabase (.gdb).')
+        raise ValueError('The output path must correspond to a file geodatabase (.gdb).')
+
+    # If the scratch path is not a file geodatabase, end the process
+    if get_workspace_extension(workspace_path = scratch_gdb) != '.gdb':
+        arcpy.AddError('The scratch path must correspond to a file geodatabase (.gdb).')
+        raise ValueError('The scratch path must correspond to a file geodatabase (.gdb).')
+
+    # Set the geoprocessing environments once for the whole run instead of entering a fresh
+    # environment context on every helper call
+    arcpy.env.overwriteOutput = True
+    arcpy.env.processorType = 'GPU'
+    arcpy.env.gpuId = 0
+    arcpy.env.parallelProcessingFactor = '100%'
+
+    # Set the scratch workspace to the scratch file geodatabase path
+    arcpy.env.scratchWorkspace = scratch_gdb
+
+    # Create a list of input images with arcpy.da.Walk, which enumerates only raster datasets
+    # and does not require repointing the workspace environment at the input file geodatabase
+    images = [raster
+              for dirpath, dirnames, rasters in arcpy.da.Walk(
+                  input_images_gdb,
+                  datatype = 'RasterDataset',
+                  )
+              for raster in rasters]
+
+    # Count the total number of images
+    images_remaining = len(images)
+
+    # If there are zero images, end the process
+    if images_remaining == 0:
+        arcpy.AddError('The input images file geodatabase contains zero rasters.')
+        raise FileNotFoundError('The input images file geodatabase contains zero rasters.')
+
+    # create dictionary of input models
+    model_dictionary = {}
+
+    # The dual-class model delineates both damage classes in one inference pass per image, so
+    # when it is supplied the single-class models are redundant and skipped by default
+    if model_path_dual != '' and force_separate_models.lower() != 'true':
+        model_dictionary['dual'] = model_path_dual
+        if model_path_decking != '' or model_path_hole != '':
+            message = ('The dual-class model covers both damage classes, so the '
+                       'single-class models have been skipped. Set the force separate '
+                       'models parameter to run them anyway.')
+            arcpy.AddMessage(message)
+            print(message)
+    else:
+        if model_path_decking != '':
+            model_dictionary['decking'] = model_path_decking
+
+        if model_path_hole != '':
+            model_dictionary['hole'] = model_path_hole
+
+        if model_path_dual != '':
+            model_dictionary['dual'] = model_path_dual
+
+    # Configure the tool's progress bar to increment by one step per image. Ranging the
+    # progressor over the image count instead of 0-100 avoids the integer truncation that froze
+    # the bar when there were more than 100 images, and needs only one position update per image.
+    arcpy.SetProgressor(
+        type = 'step',
+        message = '',
+        min_range = 0,
+        max_range = images_remaining,
+        step_value = 1,
+        )
+
+    # Track the roof damage feature classes predicted for each image
+    predicted_fclass_paths_by_image = {image: [] for image in images}
+
+    # For each model, delineate roof damage in every image before moving to the next model.
+    # Keeping each model's inference calls consecutive means the model is loaded once per run
+    # instead of once per image, which avoids repaying the model load and GPU warm-up cost
+    # on every image. (arcpy has no public API for holding a .dlpk resident across
+    # ClassifyPixelsUsingDeepLearning calls, so consecutive same-model calls are the closest
+    # available way to reuse Esri's internal model cache.)
+    for damage_class, model_path in model_dictionary.items():
+
+        # For each image:
+        for image in images:
+
+            arcpy.SetProgressorLabel(f'Delineating roof damage in {image} '
+                                     f'using the {damage_class} model')
+            print(f'Delineating roof damage in {image} using the {damage_class} model')
+
+            # Build the iteration's paths once
+            image_path = os.path.join(input_images_gdb, image)
+            predicted_fclass_path = f'memory\\{image}_{damage_class}'
+
+            # Generate a roof damage raster
+            roof_damage_raster = generate_classified_raster(
+                input_image_path = image_path,
+                input_model_path = model_path,
+                )
+
+            # If the model predicted zero damage pixels, skip polygonizing the empty
+            # raster; with background pixels left unpredicted, a no-damage raster is all
+            # NoData, which makes the properties request itself fail for lack of statistics
+            try:
+                raster_maximum = float(arcpy.management.GetRasterProperties(
+                    in_raster = roof_damage_raster,
+                    property_type = 'MAXIMUM',
+                    ).getOutput(0))
+            except arcpy.ExecuteError:
+                raster_maximum = 0
+            if raster_maximum == 0:
+                message = f'The {damage_class} model predicted zero damage pixels in {image}.'
+                arcpy.AddMessage(message)
+                print(message)
+                continue
+
+            # Convert the roof damage raster to a single-part polygon feature class in the
+            # in-memory workspace, which skips writing and re-reading the intermediate feature
+            # class on disk
+            raster_to_fclass(
+                input_raster_path = roof_damage_raster,
+                output_fclass_path = predicted_fclass_path,
+                )
+
+            # Record the feature class for the image's merge
+            predicted_fclass_paths_by_image[image].append(predicted_fclass_path)
+
+    # For each image:
+    # (This loop is intentionally serial. Dispatching the vectorize-and-merge work to a process
+    # pool was evaluated and rejected: the GPU serializes the inference stage regardless, each
+    # worker process would have to check out its own arcpy license and re-read the classified
+    # rasters from disk, and the output file geodatabase only supports a single writer, so the
+    # merged outputs would contend on the same workspace lock.)
+    for image in images:
+
+        # Get the list of the paths to the roof damage feature classes predicted by each model
+        predicted_fclass_paths = predicted_fclass_paths_by_image[image]
+
+        # Create the image's output feature class; it stays empty when zero damage was predicted
+        create_class_fclass(
+            output_fclass_path = os.path.join(output_fclasses_gdb, image),
+            spatial_reference = arcpy.Describe(
+                os.path.join(input_images_gdb, image)).spatialReference,
+            )
+
+        if len(predicted_fclass_paths) > 0:
+            # Stream the model-specific features into the image's output feature class
+            stream_fclasses(
+                fclass_paths_list = predicted_fclass_paths,
+                output_fclass_path = os.path.join(output_fclasses_gdb, image),
+                )
+
+            # Delete the image's in-memory feature classes to free RAM
+            arcpy.management.Delete(predicted_fclass_paths)
+
+        # Update the progress indicators
+        arcpy.SetProgressorPosition()
+        images_remaining -= 1
+        message = f'Delineated roof damage in {image}. {images_remaining} images remaining.'
+        arcpy.AddMessage(message)
+        print(message)
+
+    # Confirm processing is done
+    message = f'\nExported predicted polygons feature classes to {output_fclasses_gdb}'
+    arcpy.AddMessage(message)
+    print(message)
+
+
+# Delineate roof damage in each image
+if __name__ == '__main__':
+    main()
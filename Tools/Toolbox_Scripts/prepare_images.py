@@ -1,404 +1,675 @@
-"""
-This is the script for the Prepare Images tool, which is part of the Roof Damage Assessment
-toolbox for Esri ArcGIS Pro. The script can be run using the Prepare Images tool or it can be
-imported as a module and run by calling the main() function.
-
-For full methodological details, please refer to the publication:
-
-Kucharczyk, M., Nesbit, P. R., & Hugenholtz, C. H. (2025). Automated Mapping of Post-Storm
-Roof Damage Using Deep Learning and Aerial Imagery: A Case Study in the Caribbean. Remote Sensing,
-17(20), 3456. https://doi.org/10.3390/rs17203456
-
-For usage instructions, please visit: https://github.com/maja-kucharczyk/roof-damage-assessment
-
-Created by: Maja Kucharczyk
-
-Version: 1.0.0 (2026-01-25)
-
-This work is licensed under CC BY 4.0 (Creative Commons Attribution 4.0 International), a permissive
-license allowing anyone to freely share, copy, adapt, and use material for any purpose, even
-commercially, as long as they give proper attribution (credit) to the original creators, indicate
-if changes were made, and provide a link to the license.
-"""
-
-
-# Imports
-import os
-import arcpy
-
-
-def get_workspace_extension(
-        workspace_path: str,
-        ) -> str:
-    """
-    Returns the extension of a workspace path.
-    
-    Args:
-        workspace_path (string): The path to the workspace.
-        
-    Returns:
-        string: The extension of the workspace.
-    """
-    name_with_extension = os.path.basename(workspace_path)
-    extension = os.path.splitext(name_with_extension)[1]
-    return extension
-
-
-def get_file_name(
-        file_path: str,
-        ) -> str:
-    """
-    Returns the name of a file without its extension.
-    
-    Args:
-        file_path (string): The path to the file.
-        
-    Returns:
-        string: The name of the file without its extension.
-    """
-    name_with_extension = os.path.basename(file_path)
-    name_without_extension = os.path.splitext(name_with_extension)[0]
-    return name_without_extension
-
-
-def get_spatial_ref_type(
-        data_path: str,
-        ) -> str:
-    """
-    Returns the spatial reference type of a data element.
-    
-    Args:
-        data_path (string): The path to the data element.
-        
-    Returns:
-        string: The spatial reference type of the data element.
-    """
-    spatial_ref_type = arcpy.Describe(data_path).spatialreference.type
-    return spatial_ref_type
-
-
-def extract_rgb_bands(
-        input_image_path: str,
-        output_layer_path: str,
-        ):
-    """
-    Extracts bands 1, 2, and 3 of an image and creates a temporary RGB raster layer.
-    
-    Args:
-        input_image_path (string): The path to the input image.
-        output_layer_path (string): The path to the output temporary RGB raster layer.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            pyramid = 'NONE',
-            rasterStatistics = 'NONE',
-            resamplingMethod = 'CUBIC'):
-        arcpy.management.MakeRasterLayer(
-            in_raster = input_image_path,
-            out_rasterlayer = output_layer_path,
-            band_index = '1;2;3',
-            )
-
-
-def get_spatial_ref_string(
-        data_path: str,
-        ) -> str:
-    """
-    Returns the spatial reference string of a data element.
-    
-    Args:
-        data_path (string): The path to the data element.
-        
-    Returns:
-        string: The spatial reference string of the data element.
-    """
-    spatial_ref_string = arcpy.Describe(data_path).spatialreference.exportToString()
-    return spatial_ref_string
-
-
-def project_resample_image(
-        input_image_path: str,
-        output_image_path: str,
-        spatial_ref_string: str,
-        ):
-    """
-    Projects an image and resamples it to 0.05 m/px using cubic convolution.
-    
-    Args:
-        input_image_path (string): The path to the input image.
-        output_image_path (string): The path to the output image.
-        spatial_ref_string (string): The string of the output spatial reference.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            pyramid = 'NONE',
-            rasterStatistics = 'NONE',
-            resamplingMethod = 'CUBIC'):
-        arcpy.management.ProjectRaster(
-            in_raster = input_image_path,
-            out_raster = output_image_path,
-            out_coor_system = spatial_ref_string,
-            resampling_type = 'CUBIC',
-            cell_size = 0.05,
-            )
-
-
-def resample_image(
-        input_image_path: str,
-        output_image_path: str,
-        ):
-    """
-    Resamples an image to 0.05 m/px using cubic convolution.
-    
-    Args:
-        input_image_path (string): The path to the input image.
-        output_image_path (string): The path to the output image.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            pyramid = 'NONE',
-            rasterStatistics = 'NONE',
-            resamplingMethod = 'CUBIC'):
-        arcpy.management.Resample(
-            in_raster = input_image_path,
-            out_raster = output_image_path,
-            cell_size = 0.05,
-            resampling_type = 'CUBIC',
-            )
-
-
-def clip_image(
-        input_image_path,
-        output_image_path: str,
-        clipping_fclass_path: str,
-        ):
-    """
-    Clips an image using its boundary polygon.
-    
-    Args:
-        input_image_path (string): The path to the input image.
-        output_image_path (string): The path to the output image.
-        clipping_fclass_path (string): The path to the feature class used for clipping the image.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            pyramid = 'NONE',
-            rasterStatistics = 'NONE',
-            resamplingMethod = 'CUBIC'):
-        arcpy.management.Clip(
-            in_raster = input_image_path,
-            out_raster = output_image_path,
-            in_template_dataset = clipping_fclass_path,
-            clipping_geometry = 'ClippingGeometry',
-            )
-
-
-def export_image(
-        input_image_path: str,
-        output_image_path: str,
-        ):
-    """
-    Exports an image to an 8-bit unsigned file geodatabase raster.
-    
-    Args:
-        input_image_path (string): The path to the input image.
-        output_image_path (string): The path to the output image.
-    """
-    with arcpy.EnvManager(
-            overwriteOutput = True,
-            pyramid = 'PYRAMIDS -1 CUBIC LZ77 NO_SKIP',
-            rasterStatistics = 'STATISTICS',
-            resamplingMethod = 'CUBIC'):
-        arcpy.management.CopyRaster(
-            in_raster = input_image_path,
-            out_rasterdataset = output_image_path,
-            pixel_type = '8_BIT_UNSIGNED',
-            )
-
-
-def main(
-        input_images_folder: str = arcpy.GetParameterAsText(0),
-        boundary_polygons_gdb: str = arcpy.GetParameterAsText(1),
-        output_images_gdb: str = arcpy.GetParameterAsText(2),
-        scratch_gdb: str = arcpy.GetParameterAsText(3),
-        ):
-    """
-    Prepares aerial images for roof decking and roof hole deep learning model training and inference.
-    
-    The following processing is performed on each image: 
-        • extracting RGB bands, if needed; 
-        • projecting, if needed; 
-        • resampling to 0.05 m/px using cubic convolution; 
-        • clipping by the corresponding boundary polygon; and 
-        • exporting to an 8-bit unsigned file geodatabase raster.
-    
-    Args:
-        input_images_folder (string): The path to the input images folder.
-        boundary_polygons_gdb (string): The path to the image boundary polygons file geodatabase.
-        output_images_gdb (string): The path to the output file geodatabase for prepared images.
-        scratch_gdb (string): The path to the scratch file geodatabase for intermediate outputs.
-        
-    Raises:
-        FileNotFoundError: If a workspace does not exist or if an input image type is invalid.
-        ValueError: If boundary_polygons_gdb, output_images_gdb, or scratch_gdb does not correspond
-                    to a file geodatabase.
-    """
-
-    # If a workspace does not exist, end the process
-    for workspace in [input_images_folder, boundary_polygons_gdb, output_images_gdb, scratch_gdb]:
-        if os.path.exists(workspace):
-            continue
-        arcpy.AddError(f'{workspace} does not exist.')
-        raise FileNotFoundError(f'{workspace} does not exist.')
-
-    # If the boundary polygons path is not a file geodatabase, end the process
-    if get_workspace_extension(workspace_path = boundary_polygons_gdb) != '.gdb':
-        arcpy.AddError('The boundary polygons path must correspond to a file geodatabase (.gdb).')
-        raise ValueError('The boundary polygons path must correspond to a file geodatabase (.gdb).')
-
-    # If the output images path is not a file geodatabase, end the process
-    if get_workspace_extension(workspace_path = output_images_gdb) != '.gdb':
-        arcpy.AddError('The output images path must correspond to a file geodatabase (.gdb).')
-        raise ValueError('The output images path must correspond to a file geodatabase (.gdb).')
-
-    # If the scratch path is not a file geodatabase, end the process
-    if get_workspace_extension(workspace_path = scratch_gdb) != '.gdb':
-        arcpy.AddError('The scratch path must correspond to a file geodatabase (.gdb).')
-        raise ValueError('The scratch path must correspond to a file geodatabase (.gdb).')
-
-    # Set the scratch workspace to the scratch file geodatabase path
-    arcpy.env.scratchWorkspace = scratch_gdb
-
-    # Create a list of images to prepare
-    arcpy.env.workspace = input_images_folder
-    images = arcpy.ListRasters()
-
-    # Count the total number of images
-    images_remaining = len(images)
-
-    # If there are zero valid images, end the process
-    if images_remaining == 0:
-        arcpy.AddError('The input images folder contains zero valid images. '
-                       'Valid raster types include BMP, GIF, IMG, JP2, JPG, PNG, TIF, and GRID.')
-        raise FileNotFoundError('The input images folder contains zero valid images. '
-                       'Valid raster types include BMP, GIF, IMG, JP2, JPG, PNG, TIF, and GRID.')
-
-    # Create a list of skipped images
-    skipped_images = []
-
-    # Create a list of image boundary polygon feature classes
-    arcpy.env.workspace = boundary_polygons_gdb
-    boundary_fclasses = arcpy.ListFeatureClasses()
-
-    # Configure the tool's progress bar to increment by 33% since there are three
-    # time-consuming preparation steps per image (resampling, clipping, exporting)
-    arcpy.SetProgressor(
-        type = 'step',
-        message = '',
-        min_range = 0,
-        max_range = 100,
-        step_value = 33,
-        )
-
-    for image in images:
-        # Get the name of the image
-        image_name = get_file_name(
-            file_path = os.path.join(input_images_folder, image),
-            )
-
-        # If the image does not have a corresponding boundary feature class, skip the image
-        if image_name not in boundary_fclasses:
-            skipped_images.append(image)
-            images_remaining -= 1
-            arcpy.AddWarning(f'A feature class named {image_name} does not exist in the image '
-                             f'boundary polygons file geodatabase. {image} has been skipped. '
-                             f'{images_remaining} images remaining.')
-            print(f'A feature class named {image_name} does not exist in the image '
-                             f'boundary polygons file geodatabase. {image} has been skipped. '
-                             f'{images_remaining} images remaining.')
-            continue
-
-        # Get the spatial reference type of the image
-        image_sr_type = get_spatial_ref_type(
-            data_path = os.path.join(input_images_folder, image),
-            )
-
-        # If the image's spatial reference is unknown, skip the image
-        if image_sr_type == 'Unknown':
-            skipped_images.append(image)
-            images_remaining -= 1
-            arcpy.AddWarning(f'The spatial reference of {image} is unknown and needs to be defined.'
-                             f' The image has been skipped. {images_remaining} images remaining.')
-            print(f'The spatial reference of {image} is unknown and needs to be defined.'
-                             f' The image has been skipped. {images_remaining} images remaining.')
-            continue
-
-        # If the image's spatial reference is a geographic coordinate system, then the image is from
-        # the NOAA NGS Emergency Response Imagery dataset and needs the following initial prep:
-        if image_sr_type == 'Geographic':
-            extract_rgb_bands(
-                input_image_path = os.path.join(input_images_folder, image),
-                output_layer_path = os.path.join(scratch_gdb, 'temp_raster_layer'),
-                )
-            boundary_sr_string = get_spatial_ref_string(
-                data_path = os.path.join(boundary_polygons_gdb, image_name),
-                )
-            arcpy.SetProgressorLabel(f'Projecting and resampling {image}')
-            print(f'Projecting and resampling {image}')
-            project_resample_image(
-                input_image_path = os.path.join(scratch_gdb, 'temp_raster_layer'),
-                output_image_path = os.path.join(scratch_gdb, 'resampled'),
-                spatial_ref_string = boundary_sr_string,
-                )
-            arcpy.SetProgressorPosition()
-
-        # If the image's spatial reference is a projected coordinate system, then the image is from
-        # the drone imagery dataset and needs the following initial prep:
-        if image_sr_type == 'Projected':
-            arcpy.SetProgressorLabel(f'Resampling {image}')
-            print(f'Projecting and resampling {image}')
-            resample_image(
-                input_image_path = os.path.join(input_images_folder, image),
-                output_image_path = os.path.join(scratch_gdb, 'resampled'),
-                )
-            arcpy.SetProgressorPosition()
-
-        # All images need the following remaining prep:
-        arcpy.SetProgressorLabel(f'Clipping {image}')
-        print(f'Clipping {image}')
-        clip_image(
-            input_image_path = os.path.join(scratch_gdb, 'resampled'),
-            output_image_path = os.path.join(scratch_gdb, 'clipped'),
-            clipping_fclass_path = os.path.join(boundary_polygons_gdb, image_name),
-            )
-        arcpy.SetProgressorPosition()
-        arcpy.SetProgressorLabel(f'Exporting {image}')
-        print(f'Exporting {image}')
-        export_image(
-            input_image_path = os.path.join(scratch_gdb, 'clipped'),
-            output_image_path = os.path.join(output_images_gdb, image_name),
-            )
-
-        # Update the progress indicators
-        arcpy.SetProgressorPosition()
-        images_remaining -= 1
-        arcpy.AddMessage(f'Prepared {image}. {images_remaining} images remaining.')
-        print(f'Prepared {image}. {images_remaining} images remaining.')
-        arcpy.SetProgressorPosition(position = 0)
-
-    # Confirm processing is done
-    arcpy.AddMessage(f'\nExported prepared images to {output_images_gdb}')
-    print(f'\nExported prepared images to {output_images_gdb}')
-
-    # Report which images, if any, were skipped
-    if len(skipped_images) > 0:
-        arcpy.AddMessage('\nThe following images were skipped:')
-        print('\nThe following images were skipped:')
-        for image in skipped_images:
-            arcpy.AddMessage(image)
-            print(image)
-
-
-# Prepare each image
-if __name__ == '__main__':
-    main()
+"""
+This is the script for the Prepare Images tool, which is part of the Roof Damage Assessment
+toolbox for Esri ArcGIS Pro. The script can be run using the Prepare Images tool or it can be
+imported as a module and run by calling the main() function.
+
+For full methodological details, please refer to the publication:
+
+Kucharczyk, M., Nesbit, P. R., & Hugenholtz, C. H. (2025). Automated Mapping of Post-Storm
+Roof Damage Using Deep Learning and Aerial Imagery: A Case Study in the Caribbean. Remote Sensing,
+17(20), 3456. https://doi.org/10.3390/rs17203456
+
+For usage instructions, please visit: https://github.com/maja-kucharczyk/roof-damage-assessment
+
+Created by: Maja Kucharczyk
+
+Version: 1.0.0 (2026-01-25)
+
+This work is licensed under CC BY 4.0 (Creative Commons Attribution 4.0 International), a permissive
+license allowing anyone to freely share, copy, adapt, and use material for any purpose, even
+commercially, as long as they give proper attribution (credit) to the original creators, indicate
+if changes were made, and provide a link to the license.
+"""
+
+
+# Imports
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+import shutil
+import sys
+import arcpy
+
+# GDAL ships with ArcGIS Pro's Python environment and can fuse the band extraction,
+# reprojection, resampling, and clipping into one warp pass, but the import is still
+# guarded so the tool falls back to the per-step arcpy chain where osgeo is unavailable
+try:
+    from osgeo import gdal
+    USE_GDAL_WARP = True
+except ImportError:
+    USE_GDAL_WARP = False
+
+
+def get_workspace_extension(
+        workspace_path: str,
+        ) -> str:
+    """
+    Returns the extension of a workspace path.
+    
+    Args:
+        workspace_path (string): The path to the workspace.
+        
+    Returns:
+        string: The extension of the workspace.
+    """
+    name_with_extension = os.path.basename(workspace_path)
+    extension = os.path.splitext(name_with_extension)[1]
+    return extension
+
+
+def set_worker_python_executable():
+    """
+    Points multiprocessing at the environment's Python interpreter before worker processes
+    are spawned. When the script runs as a script tool, sys.executable is the ArcGIS Pro
+    application itself, and each spawned worker would launch a new ArcGIS Pro instance
+    instead of a Python process.
+    """
+    if 'python' not in os.path.basename(sys.executable).lower():
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, 'pythonw.exe'))
+
+
+def get_worker_scratch_folder(
+        scratch_gdb: str,
+        ) -> str:
+    """
+    Returns the path of the run-scoped folder that holds the worker processes' scratch
+    workspaces. The folder sits beside the scratch file geodatabase, since a file
+    geodatabase cannot contain other workspaces, and the parent process deletes it once
+    the workers are done, so the per-process scratch names do not accumulate across runs.
+    
+    Args:
+        scratch_gdb (string): The path to the scratch file geodatabase.
+        
+    Returns:
+        string: The path of the worker scratch folder.
+    """
+    return os.path.splitext(scratch_gdb)[0] + '_workers'
+
+
+def get_file_name(
+        file_path: str,
+        ) -> str:
+    """
+    Returns the name of a file without its extension.
+    
+    Args:
+        file_path (string): The path to the file.
+        
+    Returns:
+        string: The name of the file without its extension.
+    """
+    name_with_extension = os.path.basename(file_path)
+    name_without_extension = os.path.splitext(name_with_extension)[0]
+    return name_without_extension
+
+
+@functools.lru_cache(maxsize = None)
+def get_spatial_ref_type(
+        data_path: str,
+        ) -> str:
+    """
+    Returns the spatial reference type of a data element.
+    
+    Args:
+        data_path (string): The path to the data element.
+        
+    Returns:
+        string: The spatial reference type of the data element.
+    """
+    spatial_ref_type = arcpy.Describe(data_path).spatialreference.type
+    return spatial_ref_type
+
+
+def extract_rgb_bands(
+        input_image_path: str,
+        output_layer_path: str,
+        ):
+    """
+    Extracts bands 1, 2, and 3 of an image and creates a temporary RGB raster layer.
+    
+    Args:
+        input_image_path (string): The path to the input image.
+        output_layer_path (string): The path to the output temporary RGB raster layer.
+    """
+    arcpy.management.MakeRasterLayer(
+        in_raster = input_image_path,
+        out_rasterlayer = output_layer_path,
+        band_index = '1;2;3',
+        )
+
+
+@functools.lru_cache(maxsize = None)
+def get_spatial_ref_string(
+        data_path: str,
+        ) -> str:
+    """
+    Returns the spatial reference string of a data element.
+    
+    Args:
+        data_path (string): The path to the data element.
+        
+    Returns:
+        string: The spatial reference string of the data element.
+    """
+    spatial_ref_string = arcpy.Describe(data_path).spatialreference.exportToString()
+    return spatial_ref_string
+
+
+@functools.lru_cache(maxsize = None)
+def get_spatial_ref_code(
+        data_path: str,
+        ) -> int:
+    """
+    Returns the well-known ID of the spatial reference of a data element.
+    
+    Args:
+        data_path (string): The path to the data element.
+        
+    Returns:
+        integer: The well-known ID of the spatial reference, or 0 when it has none.
+    """
+    spatial_ref_code = arcpy.Describe(data_path).spatialreference.factoryCode
+    return spatial_ref_code
+
+
+def warp_image(
+        input_image_path: str,
+        output_image_path: str,
+        boundary_polygons_gdb: str,
+        boundary_fclass_name: str,
+        target_spatial_ref_string: str,
+        extract_rgb: bool,
+        ):
+    """
+    Prepares an image with a single GDAL warp pass that fuses the RGB band extraction (via
+    an in-memory virtual raster), the reprojection, the cubic resampling to 0.05 m/px, and the clip by
+    the boundary polygon (via a cutline read straight from the file geodatabase). The
+    intermediate resampled and clipped rasters of the arcpy chain never materialize; the
+    output is a staging GeoTIFF because GDAL cannot write file geodatabase rasters.
+    
+    Args:
+        input_image_path (string): The path to the input image.
+        output_image_path (string): The path to the output staging GeoTIFF.
+        boundary_polygons_gdb (string): The path to the image boundary polygons file geodatabase.
+        boundary_fclass_name (string): The name of the boundary feature class to clip with.
+        target_spatial_ref_string (string): The spatial reference string to project to, or
+                                            None to keep the source spatial reference.
+        extract_rgb (boolean): Whether to restrict the output to bands 1, 2, and 3.
+    """
+    # Restrict the source to its RGB bands through a metadata-only virtual raster held in
+    # GDAL's in-memory filesystem, so the band subset never costs a pixel pass or a file
+    if extract_rgb:
+        source_path = f'/vsimem/{boundary_fclass_name}_rgb.vrt'
+        gdal.BuildVRT(source_path, input_image_path, bandList = [1, 2, 3])
+    else:
+        source_path = input_image_path
+
+    # Project (if requested), resample, and clip in one pass
+    warp_options = {
+        'format': 'GTiff',
+        'xRes': 0.05,
+        'yRes': 0.05,
+        'resampleAlg': 'cubic',
+        'cutlineDSName': boundary_polygons_gdb,
+        'cutlineLayer': boundary_fclass_name,
+        'cropToCutline': True,
+        'outputType': gdal.GDT_Byte,
+        'multithread': True,
+        'warpOptions': ['NUM_THREADS=ALL_CPUS'],
+        # Write the staging GeoTIFF in pixel-interleaved 512 x 512 tiles so the export and
+        # the downstream deep learning tools read whole aligned blocks instead of
+        # amplifying each 512 px tile request across long scanlines
+        'creationOptions': [
+            'TILED=YES',
+            'BLOCKXSIZE=512',
+            'BLOCKYSIZE=512',
+            'INTERLEAVE=PIXEL',
+            'COMPRESS=LZW',
+            'PREDICTOR=2',
+            'BIGTIFF=IF_SAFER',
+            ],
+        # Cap the warper's working set so very wide mosaics are processed in bounded
+        # horizontal chunks instead of materializing whole output rows at once
+        'warpMemoryLimit': 256 * 1024 * 1024,
+        }
+    if target_spatial_ref_string:
+        # The Esri spatial reference string is passed through as-is; GDAL's SRS parser
+        # accepts it directly, whereas the factory code alone is not reliably an EPSG
+        # code (many projected systems carry ESRI-authority WKIDs)
+        warp_options['dstSRS'] = target_spatial_ref_string
+    gdal.Warp(output_image_path, source_path, **warp_options)
+
+    # Free the in-memory virtual raster
+    if extract_rgb:
+        gdal.Unlink(source_path)
+
+
+def project_resample_image(
+        input_image_path: str,
+        output_image_path: str,
+        spatial_ref_string: str,
+        ):
+    """
+    Projects an image and resamples it to 0.05 m/px using cubic convolution.
+    
+    Args:
+        input_image_path (string): The path to the input image.
+        output_image_path (string): The path to the output image.
+        spatial_ref_string (string): The string of the output spatial reference.
+    """
+    arcpy.management.ProjectRaster(
+        in_raster = input_image_path,
+        out_raster = output_image_path,
+        out_coor_system = spatial_ref_string,
+        resampling_type = 'CUBIC',
+        cell_size = 0.05,
+        )
+
+
+def resample_image(
+        input_image_path: str,
+        output_image_path: str,
+        ):
+    """
+    Resamples an image to 0.05 m/px using cubic convolution.
+    
+    Args:
+        input_image_path (string): The path to the input image.
+        output_image_path (string): The path to the output image.
+    """
+    arcpy.management.Resample(
+        in_raster = input_image_path,
+        out_raster = output_image_path,
+        cell_size = 0.05,
+        resampling_type = 'CUBIC',
+        )
+
+
+def clip_image(
+        input_image_path,
+        output_image_path: str,
+        clipping_fclass_path: str,
+        ):
+    """
+    Clips an image using its boundary polygon.
+    
+    Args:
+        input_image_path (string): The path to the input image.
+        output_image_path (string): The path to the output image.
+        clipping_fclass_path (string): The path to the feature class used for clipping the image.
+    """
+    arcpy.management.Clip(
+        in_raster = input_image_path,
+        out_raster = output_image_path,
+        in_template_dataset = clipping_fclass_path,
+        clipping_geometry = 'ClippingGeometry',
+        )
+
+
+def export_image(
+        input_image_path: str,
+        output_image_path: str,
+        ):
+    """
+    Exports an image to an 8-bit unsigned file geodatabase raster. Pyramids and statistics
+    are not built here; they are optionally built for the whole output file geodatabase in
+    one batch pass after all images are exported, which avoids an extra full-raster write
+    per image.
+    
+    Args:
+        input_image_path (string): The path to the input image.
+        output_image_path (string): The path to the output image.
+    """
+    with arcpy.EnvManager(
+            overwriteOutput = True,
+            pyramid = 'NONE',
+            rasterStatistics = 'NONE',
+            resamplingMethod = 'CUBIC'):
+        arcpy.management.CopyRaster(
+            in_raster = input_image_path,
+            out_rasterdataset = output_image_path,
+            pixel_type = '8_BIT_UNSIGNED',
+            )
+
+
+def prepare_image(
+        image: str,
+        image_name: str,
+        image_sr_type: str,
+        input_images_folder: str,
+        boundary_polygons_gdb: str,
+        scratch_gdb: str,
+        ) -> str:
+    """
+    Prepares one image up to and including the clipping step and returns the path to the
+    clipped raster. The function is self-contained so images can be prepared in parallel
+    worker processes: each worker writes its intermediates to its own scratch file
+    geodatabase, keyed by process id, because a file geodatabase only supports one writer
+    at a time. The export into the shared output file geodatabase is left to the parent
+    process for the same reason.
+    
+    Args:
+        image (string): The file name of the input image.
+        image_name (string): The name of the input image without its extension.
+        image_sr_type (string): The spatial reference type of the input image.
+        input_images_folder (string): The path to the input images folder.
+        boundary_polygons_gdb (string): The path to the image boundary polygons file geodatabase.
+        scratch_gdb (string): The path to the scratch file geodatabase.
+        
+    Returns:
+        string: The path to the clipped raster.
+    """
+    # Worker processes start with a default environment, so the settings the helper
+    # functions rely on are applied once per image here instead of being pushed and
+    # popped by an EnvManager around every sub-step
+    arcpy.env.overwriteOutput = True
+    arcpy.env.parallelProcessingFactor = '100%'
+    arcpy.env.pyramid = 'NONE'
+    arcpy.env.rasterStatistics = 'NONE'
+    arcpy.env.resamplingMethod = 'CUBIC'
+
+    # Build each input path once
+    input_image_path = os.path.join(input_images_folder, image)
+    boundary_fclass_path = os.path.join(boundary_polygons_gdb, image_name)
+
+    # When GDAL is available, fuse the whole preparation into one warp pass that writes a
+    # staging GeoTIFF in this worker's staging folder. Geographic images need a projected
+    # target, so they stay on this path only when the boundary polygons are projected.
+    if USE_GDAL_WARP:
+        staging_folder = os.path.join(get_worker_scratch_folder(scratch_gdb = scratch_gdb),
+                                      f'worker_{os.getpid()}_staging')
+        os.makedirs(staging_folder, exist_ok = True)
+        if image_sr_type != 'Geographic' or get_spatial_ref_type(
+                data_path = boundary_fclass_path) == 'Projected':
+            # Reproject only when the source and boundary spatial references actually
+            # differ; a matching source reduces the warp to resample-and-clip
+            target_sr_string = None
+            if image_sr_type == 'Geographic':
+                target_sr_string = get_spatial_ref_string(data_path = boundary_fclass_path)
+                if target_sr_string == get_spatial_ref_string(data_path = input_image_path):
+                    target_sr_string = None
+            print(f'Projecting, resampling, and clipping {image}')
+            staged_image_path = os.path.join(staging_folder, f'{image_name}.tif')
+            warp_image(
+                input_image_path = input_image_path,
+                output_image_path = staged_image_path,
+                boundary_polygons_gdb = boundary_polygons_gdb,
+                boundary_fclass_name = image_name,
+                target_spatial_ref_string = target_sr_string,
+                extract_rgb = image_sr_type == 'Geographic',
+                )
+            return staged_image_path
+
+    # Otherwise fall back to the per-step arcpy chain through this worker's scratch file
+    # geodatabase, created on first use
+    worker_scratch_folder = get_worker_scratch_folder(scratch_gdb = scratch_gdb)
+    os.makedirs(worker_scratch_folder, exist_ok = True)
+    worker_scratch_gdb = os.path.join(worker_scratch_folder, f'worker_{os.getpid()}.gdb')
+    if not arcpy.Exists(worker_scratch_gdb):
+        arcpy.management.CreateFileGDB(
+            out_folder_path = worker_scratch_folder,
+            out_name = os.path.basename(worker_scratch_gdb),
+            )
+    resampled_path = os.path.join(worker_scratch_gdb, f'resampled_{image_name}')
+    clipped_path = os.path.join(worker_scratch_gdb, f'clipped_{image_name}')
+
+    # If the image's spatial reference is a geographic coordinate system, then the image is
+    # from the NOAA NGS Emergency Response Imagery dataset and needs the following initial
+    # prep:
+    if image_sr_type == 'Geographic':
+        extract_rgb_bands(
+            input_image_path = input_image_path,
+            output_layer_path = f'temp_raster_layer_{os.getpid()}',
+            )
+        image_epsg_code = get_spatial_ref_code(data_path = input_image_path)
+        if image_epsg_code and image_epsg_code == get_spatial_ref_code(
+                data_path = boundary_fclass_path):
+            # The image already matches the boundary spatial reference, so the full
+            # raster reprojection is unnecessary and a plain resample suffices
+            print(f'Resampling {image}')
+            resample_image(
+                input_image_path = f'temp_raster_layer_{os.getpid()}',
+                output_image_path = resampled_path,
+                )
+        else:
+            boundary_sr_string = get_spatial_ref_string(
+                data_path = boundary_fclass_path,
+                )
+            print(f'Projecting and resampling {image}')
+            project_resample_image(
+                input_image_path = f'temp_raster_layer_{os.getpid()}',
+                output_image_path = resampled_path,
+                spatial_ref_string = boundary_sr_string,
+                )
+
+    # If the image's spatial reference is a projected coordinate system, then the image is
+    # from the drone imagery dataset and needs the following initial prep:
+    if image_sr_type == 'Projected':
+        print(f'Resampling {image}')
+        resample_image(
+            input_image_path = input_image_path,
+            output_image_path = resampled_path,
+            )
+
+    # All images need clipping by their boundary polygon
+    print(f'Clipping {image}')
+    clip_image(
+        input_image_path = resampled_path,
+        output_image_path = clipped_path,
+        clipping_fclass_path = boundary_fclass_path,
+        )
+
+    # Delete the resampled intermediate so the worker scratch does not grow unbounded
+    arcpy.management.Delete(resampled_path)
+    return clipped_path
+
+
+def main(
+        input_images_folder: str = arcpy.GetParameterAsText(0),
+        boundary_polygons_gdb: str = arcpy.GetParameterAsText(1),
+        output_images_gdb: str = arcpy.GetParameterAsText(2),
+        scratch_gdb: str = arcpy.GetParameterAsText(3),
+        build_pyramids: str = arcpy.GetParameterAsText(4),
+        ):
+    """
+    Prepares aerial images for roof decking and roof hole deep learning model training and inference.
+    
+    The following processing is performed on each image: 
+        • extracting RGB bands, if needed; 
+        • projecting, if needed; 
+        • resampling to 0.05 m/px using cubic convolution; 
+        • clipping by the corresponding boundary polygon; and 
+        • exporting to an 8-bit unsigned file geodatabase raster.
+    
+    Args:
+        input_images_folder (string): The path to the input images folder.
+        boundary_polygons_gdb (string): The path to the image boundary polygons file geodatabase.
+        output_images_gdb (string): The path to the output file geodatabase for prepared images.
+        scratch_gdb (string): The path to the scratch file geodatabase for intermediate outputs.
+        build_pyramids (string): 'true' to build pyramids and statistics on the prepared
+                                 images in one batch pass after exporting; any other value
+                                 skips them for throughput.
+        
+    Raises:
+        FileNotFoundError: If a workspace does not exist or if an input image type is invalid.
+        ValueError: If boundary_polygons_gdb, output_images_gdb, or scratch_gdb does not correspond
+                    to a file geodatabase.
+    """
+
+    # If a workspace does not exist, or a workspace that must be a file geodatabase is not
+    # one, end the process; both checks run in one pass per workspace
+    workspace_checks = [
+        (input_images_folder, None, 'input images'),
+        (boundary_polygons_gdb, '.gdb', 'boundary polygons'),
+        (output_images_gdb, '.gdb', 'output images'),
+        (scratch_gdb, '.gdb', 'scratch'),
+        ]
+    for workspace, expected_extension, workspace_description in workspace_checks:
+        if not os.path.exists(workspace):
+            arcpy.AddError(f'{workspace} does not exist.')
+            raise FileNotFoundError(f'{workspace} does not exist.')
+        if expected_extension is None:
+            continue
+        if get_workspace_extension(workspace_path = workspace) != expected_extension:
+            message = (f'The {workspace_description} path must correspond to a file '
+                       f'geodatabase (.gdb).')
+            arcpy.AddError(message)
+            raise ValueError(message)
+
+    # Set the scratch workspace to the scratch file geodatabase path
+    arcpy.env.scratchWorkspace = scratch_gdb
+
+    # Create a list of images to prepare, filtering to the valid raster types inside
+    # arcpy's own enumerator so rejected folder entries are never surfaced to Python
+    arcpy.env.workspace = input_images_folder
+    images = []
+    for raster_type in ('BMP', 'GIF', 'IMG', 'JP2', 'JPG', 'PNG', 'TIF', 'GRID'):
+        images += arcpy.ListRasters('*', raster_type)
+
+    # Count the total number of images
+    images_remaining = len(images)
+
+    # If there are zero valid images, end the process
+    if images_remaining == 0:
+        arcpy.AddError('The input images folder contains zero valid images. '
+                       'Valid raster types include BMP, GIF, IMG, JP2, JPG, PNG, TIF, and GRID.')
+        raise FileNotFoundError('The input images folder contains zero valid images. '
+                       'Valid raster types include BMP, GIF, IMG, JP2, JPG, PNG, TIF, and GRID.')
+
+    # Create a list of skipped images
+    skipped_images = []
+
+    # Create a set of image boundary polygon feature classes for constant-time lookups
+    arcpy.env.workspace = boundary_polygons_gdb
+    boundary_fclasses = frozenset(arcpy.ListFeatureClasses())
+
+    # Configure the tool's progress bar to advance one step per prepared image, the only
+    # granularity the parallel stage reports; per-sub-step updates would cross the arcpy
+    # boundary several times per image for no visible benefit
+    arcpy.SetProgressor(
+        type = 'step',
+        message = '',
+        min_range = 0,
+        max_range = images_remaining,
+        step_value = 1,
+        )
+
+    # Check each image before preparation:
+    image_tasks = []
+    for image in images:
+        # Build the image's path once and get the name of the image
+        input_image_path = os.path.join(input_images_folder, image)
+        image_name = get_file_name(
+            file_path = input_image_path,
+            )
+
+        # If the image does not have a corresponding boundary feature class, skip the image
+        if image_name not in boundary_fclasses:
+            arcpy.SetProgressorPosition()
+            skipped_images.append(image)
+            images_remaining -= 1
+            arcpy.AddWarning(f'A feature class named {image_name} does not exist in the image '
+                             f'boundary polygons file geodatabase. {image} has been skipped. '
+                             f'{images_remaining} images remaining.')
+            print(f'A feature class named {image_name} does not exist in the image '
+                             f'boundary polygons file geodatabase. {image} has been skipped. '
+                             f'{images_remaining} images remaining.')
+            continue
+
+        # Get the spatial reference type of the image
+        image_sr_type = get_spatial_ref_type(
+            data_path = input_image_path,
+            )
+
+        # If the image's spatial reference is unknown, skip the image
+        if image_sr_type == 'Unknown':
+            arcpy.SetProgressorPosition()
+            skipped_images.append(image)
+            images_remaining -= 1
+            arcpy.AddWarning(f'The spatial reference of {image} is unknown and needs to be defined.'
+                             f' The image has been skipped. {images_remaining} images remaining.')
+            print(f'The spatial reference of {image} is unknown and needs to be defined.'
+                             f' The image has been skipped. {images_remaining} images remaining.')
+            continue
+
+        # If the image passes all checks, queue the image for preparation
+        image_tasks.append((image, image_name, image_sr_type))
+
+    # Prepare the images in parallel worker processes, which each resample and clip into
+    # their own scratch file geodatabase; the prepared rasters are exported to the shared
+    # output file geodatabase serially here because a file geodatabase only supports one
+    # writer at a time
+    arcpy.SetProgressorLabel(f'Preparing {len(image_tasks)} images')
+    print(f'Preparing {len(image_tasks)} images')
+    set_worker_python_executable()
+    max_workers = max(1, (os.cpu_count() or 2) // 2)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = max_workers) as executor:
+            futures = {
+                executor.submit(
+                    prepare_image,
+                    image,
+                    image_name,
+                    image_sr_type,
+                    input_images_folder,
+                    boundary_polygons_gdb,
+                    scratch_gdb,
+                    ): (image, image_name)
+                for image, image_name, image_sr_type in image_tasks
+                }
+            for future in concurrent.futures.as_completed(futures):
+                image, image_name = futures[future]
+                clipped_path = future.result()
+
+                # Export the clipped raster to the output file geodatabase
+                arcpy.SetProgressorLabel(f'Exporting {image}')
+                print(f'Exporting {image}')
+                export_image(
+                    input_image_path = clipped_path,
+                    output_image_path = os.path.join(output_images_gdb, image_name),
+                    )
+
+                # Delete the clipped intermediate so the worker scratch does not grow unbounded
+                arcpy.management.Delete(clipped_path)
+
+                # Update the progress indicators
+                arcpy.SetProgressorPosition()
+                images_remaining -= 1
+                arcpy.AddMessage(f'Prepared {image}. {images_remaining} images remaining.')
+                print(f'Prepared {image}. {images_remaining} images remaining.')
+    finally:
+        # Remove the workers' run-scoped scratch folder; the pool has shut down here,
+        # so the worker file geodatabase locks are released
+        shutil.rmtree(get_worker_scratch_folder(scratch_gdb = scratch_gdb),
+                      ignore_errors = True)
+
+    # If requested, build pyramids and statistics for all prepared images in one batch
+    # pass, which amortizes the work the per-image exports skip
+    if build_pyramids == 'true':
+        arcpy.SetProgressorLabel('Building pyramids and statistics')
+        print('Building pyramids and statistics')
+        arcpy.management.BuildPyramidsandStatistics(
+            in_workspace = output_images_gdb,
+            build_pyramids = 'BUILD_PYRAMIDS',
+            calculate_statistics = 'CALCULATE_STATISTICS',
+            resample_technique = 'CUBIC',
+            compression_type = 'LZ77',
+            )
+
+    # Confirm processing is done
+    arcpy.AddMessage(f'\nExported prepared images to {output_images_gdb}')
+    print(f'\nExported prepared images to {output_images_gdb}')
+
+    # Report which images, if any, were skipped
+    if len(skipped_images) > 0:
+        arcpy.AddMessage('\nThe following images were skipped:')
+        print('\nThe following images were skipped:')
+        for image in skipped_images:
+            arcpy.AddMessage(image)
+            print(image)
+
+
+# Prepare each image
+if __name__ == '__main__':
+    main()